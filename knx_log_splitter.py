@@ -1,67 +1,129 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import sys
-import xmltodict
+import mmap
 import argparse
-from typing import List
+import contextlib
+import functools
+from typing import List, Tuple
+from xml.sax.saxutils import quoteattr
+from xml.parsers import expat
 from tqdm import tqdm
 
-def extract_group_address(rawdata: str, verbose: bool = False) -> str:
+# Schreibpuffer für die Ausgabedateien (1 MiB): Telegramm-Zeilen werden einzeln
+# geschrieben, der Puffer fasst sie zu wenigen großen Schreibzugriffen zusammen.
+WRITE_BUFFER_SIZE = 1 << 20
+# Die Eingabe wird in Blöcken dieser Größe an den Parser übergeben (1 MiB).
+READ_CHUNK_SIZE = 1 << 20
+
+# Vorberechnete Texte je Byte-Wert (256 Einträge): das obere Adressbyte wird per
+# Tabellenzugriff zu "H/M/" bzw. "H.L.", das untere zu seiner Dezimaldarstellung.
+_GA_PREFIX = tuple(f"{b >> 4}/{b & 0x0F}/" for b in range(256))
+_PA_PREFIX = tuple(f"{b >> 4}.{b & 0x0F}." for b in range(256))
+_DECIMAL = tuple(str(b) for b in range(256))
+
+def parse_addresses(rawdata: str, verbose: bool = False) -> Tuple[int | None, int | None]:
     """
-    Extrahiert die Gruppenadresse im Format Haupt/Mittel/Untergruppe aus dem RawData-String.
+    Extrahiert Zieladresse (Gruppenadresse) und physikalische Quelladresse in einem Durchgang
+    aus dem RawData-String und liefert sie als 16-Bit-Werte (Ziel, Quelle).
     Die ersten 11 Bytes (22 Zeichen) sind der Header, danach kommt ein BC-Byte (Priorität),
     dann die Quelladresse (2 Bytes) und dann die Zieladresse (2 Bytes).
-    Telegramme mit CC am Ende sind Bestätigungen und werden ignoriert.
+    Bestätigungen und zu kurze Telegramme haben keine Zieladresse (None),
+    Telegramme mit CC am Ende haben keine Quelladresse (None).
     """
+    # Kurze Bestätigungs-Telegramme (ACK) bestehen nur aus wenigen Bytes und
+    # tragen keine Ziel-Gruppenadresse. Diese werden hier herausgefiltert.
+    # Ignoriere Bestätigungen (nur kurze ACK-Frames, z.B. 12 Bytes = 24 Hex-Zeichen)
+    if len(rawdata) <= 24 and rawdata.endswith("CC"):
+        if verbose:
+            print(f"Ignoriere Bestätigung: {rawdata}")
+        return None, None
+
+    # Ignoriere zu kurze Telegramme (muss mindestens Header + BC + Quelladresse haben)
+    if len(rawdata) < 28:  # 22 (Header) + 2 (BC) + 4 (Quelladresse)
+        if verbose:
+            print(f"Ignoriere kurzes Telegramm: {rawdata}")
+        return None, None
+
+    # Nach dem Header (11 Bytes = 22 Zeichen) und BC (1 Byte = 2 Zeichen) kommt die
+    # Quelladresse (2 Bytes), dann die Zieladresse (2 Bytes). Beide werden mit einem
+    # einzigen bytes.fromhex dekodiert.
     try:
-        # Kurze Bestätigungs-Telegramme (ACK) bestehen nur aus wenigen Bytes und
-        # tragen keine Ziel-Gruppenadresse. Diese werden hier herausgefiltert.
-        # Ignoriere Bestätigungen (nur kurze ACK-Frames, z.B. 12 Bytes = 24 Hex-Zeichen)
-        if rawdata.endswith("CC") and len(rawdata) <= 24:
-            if verbose:
-                print(f"Ignoriere Bestätigung: {rawdata}")
-            return "IGNORE"
-            
-        # Telegramme, die noch nicht lang genug sind, um Quell- und Zieladresse zu tragen,
-        # werden als "IGNORE" klassifiziert.
-        # Ignoriere zu kurze Telegramme (muss mindestens Header + BC + 4 Bytes Adressen haben)
-        if len(rawdata) < 28:  # 22 (Header) + 2 (BC) + 4 (Adressen)
-            if verbose:
-                print(f"Ignoriere kurzes Telegramm: {rawdata}")
-            return "IGNORE"
-            
-        # Nach dem Header (11 Bytes = 22 Zeichen) und BC (1 Byte = 2 Zeichen)
-        # kommt die Quelladresse (2 Bytes), dann die Zieladresse (2 Bytes)
-        ziel_start = 28  # 22 (Header) + 2 (BC) + 4 (Quelladresse)
-        if len(rawdata) < ziel_start + 4:  # Prüfe, ob genug Bytes für die Zieladresse da sind
+        if len(rawdata) >= 32:
+            src_hi, src_lo, dst_hi, dst_lo = bytes.fromhex(rawdata[24:32])
+            destination = (dst_hi << 8) | dst_lo
+        else:
             if verbose:
                 print(f"Telegramm zu kurz für Zieladresse: {rawdata}")
-            return "IGNORE"
-            
-        byte1 = int(rawdata[ziel_start:ziel_start+2], 16)
-        byte2 = int(rawdata[ziel_start+2:ziel_start+4], 16)
-        
-        # Debug-Ausgabe nur im verbose Modus
-        if verbose:
-            print(f"Nach Header+BC+Quell: {rawdata[ziel_start:ziel_start+4]} (Bytes: {byte1:02X} {byte2:02X})")
-        
-        # Gruppenadresse berechnen:
-        # Hauptgruppe: obere 4 Bit von byte1
-        # Mittelgruppe: untere 4 Bit von byte1
-        # Untergruppe: byte2
-        haupt = (byte1 & 0xF0) >> 4
-        mittel = (byte1 & 0x0F)
-        unter = byte2
-        
-        result = f"{haupt}/{mittel}/{unter}"
-        if verbose:
-            print(f"Berechnete Adresse: {result}")
-        return result
-    except Exception as e:
+            src_hi, src_lo = bytes.fromhex(rawdata[24:28])
+            destination = None
+    except ValueError as e:
         if verbose:
             print(f"Fehler bei der Extraktion: {e}")
+        return None, None
+
+    source = None if rawdata.endswith("CC") else (src_hi << 8) | src_lo
+
+    if verbose:
+        print(f"Berechnete Adressen: GA {format_group_address(destination)}, QA {format_physical_address(source)}")
+    return destination, source
+
+# Eine Anlage hat meist nur einige hundert verschiedene Adressen: die formatierten
+# Strings werden zwischengespeichert und als gemeinsame Objekte wiederverwendet.
+@functools.lru_cache(maxsize=4096)
+def format_group_address(destination: int | None) -> str:
+    """
+    Formatiert eine Zieladresse als Gruppenadresse Haupt/Mittel/Untergruppe:
+    Hauptgruppe = obere 4 Bit, Mittelgruppe = untere 4 Bit des ersten Bytes, Untergruppe = zweites Byte.
+    """
+    if destination is None:
+        return "IGNORE"
+    return _GA_PREFIX[destination >> 8] + _DECIMAL[destination & 0xFF]
+
+@functools.lru_cache(maxsize=4096)
+def format_physical_address(source: int | None) -> str:
+    """
+    Formatiert eine Quelladresse als physikalische Adresse Haupt.Linie.Teilnehmer:
+    Bereich = obere 4 Bit, Linie = untere 4 Bit des ersten Bytes, Teilnehmer = zweites Byte.
+    """
+    if source is None:
         return ""
+    return _PA_PREFIX[source >> 8] + _DECIMAL[source & 0xFF]
+
+def parse_filter(group_address: str) -> Tuple[int, int] | None:
+    """
+    Wandelt einen Filter wie "0/7/" in (Ebene, Code) um, damit er direkt mit der numerischen
+    Zieladresse verglichen werden kann: Ebene 1 = Hauptgruppe, 2 = Haupt- und Mittelgruppe,
+    3 = vollständige Gruppenadresse. Liefert None für Filter, die nie passen können.
+    """
+    try:
+        parts = [int(p) for p in group_address.strip('/').split('/')]
+    except ValueError:
+        return None
+    limits = (0x0F, 0x0F, 0xFF)
+    if not 1 <= len(parts) <= 3 or any(not 0 <= p <= limit for p, limit in zip(parts, limits)):
+        return None
+    code = parts[0]
+    if len(parts) >= 2:
+        code = (code << 4) | parts[1]
+    if len(parts) == 3:
+        code = (code << 8) | parts[2]
+    return len(parts), code
+
+def format_telegram_line(telegram_part: str, group_address: str = "", physical_address: str = "") -> str:
+    """
+    Formatiert eine Telegramm-Zeile für die Ausgabedatei.
+    Der Kommentar beginnt in Spalte 165, das Semikolon zwischen GA und QA steht in Spalte 183.
+    Telegramme ohne Gruppenadresse (Bestätigungen) werden ohne Kommentar geschrieben.
+    """
+    if not group_address:
+        return f'    {telegram_part}\n'  # 4 Leerzeichen für die Einrückung
+
+    # 4 (Einrückung) + 161 = Spalte 165, dann "<!-- " (5) + 13 = Spalte 183
+    ga_part = f"GA: {group_address}"
+    return f'    {telegram_part.ljust(161)}<!-- {ga_part.ljust(13)}; QA: {physical_address} -->\n'
 
 class KNXSplitter:
     def __init__(self, input_file: str, group_addresses: List[str], verbose: bool = False, discard_others: bool = False):
@@ -75,8 +137,22 @@ class KNXSplitter:
             ga_norm = ga if ga.endswith('/') else ga + '/'
             self.filter_list.append(ga_norm)
         self.verbose = verbose
+        # Filter als numerische Codes je Ebene, damit die Zieladresse ohne Umweg über den
+        # formatierten String per Hash-Lookup geprüft werden kann
+        self.filter_codes: Tuple[set, set, set] = (set(), set(), set())
+        for ga in self.filter_list:
+            parsed = parse_filter(ga)
+            if parsed is None:
+                if verbose:
+                    print(f"Ungültiger Filter wird ignoriert: {ga}")
+                continue
+            level, code = parsed
+            self.filter_codes[level - 1].add(code)
         self.discard_others = discard_others
-        self.xml_data = None
+        # Attribute des Wurzelelements (inkl. Namespace), werden von read_xml() befüllt
+        self.commlog_attrs: List[Tuple[str, str]] | None = None
+        # Fertig formatierter Dateikopf (XML-Deklaration + CommunicationLog-Tag), einmal in read_xml() erzeugt
+        self.header: str | None = None
         
         # Erstelle den Dateinamen aus der Gruppenadresse
         # Ersetze / durch _ und entferne führende/nachfolgende _
@@ -85,222 +161,160 @@ class KNXSplitter:
         self.output_filename = f"knx_tel_{joined}.xml"
         self.other_filename = "knx_tel.xml"
         
-    @staticmethod
-    def get_physical_address(rawdata: str) -> str:
-        """
-        Extrahiert die physikalische Quelladresse im Format Haupt.Linie.Teilnehmer aus dem RawData-String.
-        Die ersten 11 Bytes (22 Zeichen) sind der Header, dann kommt ein BC-Byte (Priorität),
-        danach die Quelladresse (2 Bytes).
-        Telegramme mit CC am Ende sind Bestätigungen und werden ignoriert.
-        """
-        try:
-            # Ignoriere Bestätigungen (CC am Ende)
-            if rawdata.endswith("CC"):
-                return ""
-                
-            # Ignoriere zu kurze Telegramme
-            if len(rawdata) < 26:  # 22 (Header) + 2 (BC) + 2 (Quelladresse)
-                return ""
-                
-            # Nach dem Header (11 Bytes = 22 Zeichen) und BC (1 Byte = 2 Zeichen)
-            # kommt die Quelladresse (2 Bytes)
-            quell_start = 24  # 22 (Header) + 2 (BC)
-            byte1 = int(rawdata[quell_start:quell_start+2], 16)
-            byte2 = int(rawdata[quell_start+2:quell_start+4], 16)
-            
-            # Quelladresse berechnen:
-            # Hauptgruppe: obere 4 Bit von byte1
-            # Linie: untere 4 Bit von byte1
-            # Teilnehmer: byte2
-            haupt = (byte1 & 0xF0) >> 4
-            linie = (byte1 & 0x0F)
-            teilnehmer = byte2
-            
-            return f"{haupt}.{linie}.{teilnehmer}"
-        except Exception:
-            return ""
-
     def read_xml(self) -> None:
-        """Liest die XML-Datei ein."""
+        """Liest die Kopfdaten (Attribute von CommunicationLog) der XML-Datei ein."""
         try:
-            # Schritt 1: Anzahl Zeilen ermitteln, damit bei sehr großen Dateien ein grober
-            # Fortschritt (ein Punkt je 1000 Zeilen) angezeigt werden kann.
-            total_lines = 0
-            with open(self.input_file, 'r', encoding='utf-8') as file:
-                for _ in file:
-                    total_lines += 1
-                    if total_lines % 1000 == 0:
-                        print(".", end="", flush=True)
-            print()  # Neue Zeile nach dem Fortschrittsbalken
-
-            # Schritt 2: Datei vollständig einlesen und per xmltodict parsen.
-            with open(self.input_file, 'r', encoding='utf-8') as file:
-                content = file.read()
-                if self.verbose:
-                    print(f"XML-Inhalt (erste 200 Zeichen): {content[:200]}")
-                self.xml_data = xmltodict.parse(content)
-            print(f"XML-Datei erfolgreich eingelesen ({total_lines} Zeilen).")
-            
-            # Optional: erste Telegramme zeigen (nur im verbose Modus)
-            if self.verbose and 'CommunicationLog' in self.xml_data and 'Telegram' in self.xml_data['CommunicationLog']:
-                telegrams = self.xml_data['CommunicationLog']['Telegram']
-                if not isinstance(telegrams, list):
-                    telegrams = [telegrams]
-                print("\nErste 3 Telegramme:")
-                for i, t in enumerate(telegrams[:3]):
-                    print(f"Telegramm {i+1}: {t.get('@RawData', '')}")
+            # Nur das Wurzelelement lesen; die Telegramme werden erst in split_and_save()
+            # gestreamt, damit nie die ganze Datei im Speicher liegt. Ein vorheriges
+            # Zeilenzählen entfällt, da es die Datei ein zweites Mal lesen würde.
+            # Ohne Namespace-Verarbeitung liefert expat xmlns wie ein normales Attribut.
+            def on_start(name, attrs):
+                if self.commlog_attrs is None:
+                    self.commlog_attrs = list(attrs.items())
+
+            parser = expat.ParserCreate()
+            parser.StartElementHandler = on_start
+            with open(self.input_file, 'rb') as file:
+                while self.commlog_attrs is None:
+                    chunk = file.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    parser.Parse(chunk, False)
+            if self.commlog_attrs is None:
+                raise ValueError("Kein Wurzelelement gefunden.")
+            attrs = ''.join(f' {k}={quoteattr(v)}' for k, v in self.commlog_attrs)
+            self.header = f'<?xml version="1.0" encoding="utf-8"?>\n<CommunicationLog{attrs}>\n'
+            print(f"XML-Datei erfolgreich eingelesen ({os.path.getsize(self.input_file)} Bytes).")
+            if self.verbose:
+                print(f"CommunicationLog-Attribute: {self.commlog_attrs}")
         except Exception as e:
             print(f"Fehler beim Lesen der XML-Datei: {e}")
             sys.exit(1)
 
+    def open_output(self, path: str):
+        """Öffnet eine Ausgabedatei mit großem Schreibpuffer und schreibt XML-Deklaration und CommunicationLog-Tag."""
+        file = open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+        file.write(self.header)
+        return file
+
     def split_and_save(self) -> None:
         """Teilt die Telegramme und speichert sie in zwei separate XML-Dateien mit Adress-Kommentar nach dem selbstschließenden Telegram-Tag."""
-        if self.xml_data is None:
+        if self.header is None:
             raise ValueError("Keine Daten geladen. Bitte zuerst read_xml() aufrufen.")
 
-        # Sammler für beide Ausgaben aufbauen
-        filtered_telegrams = []
-        other_telegrams = []
-        filtered_comments = []
-        other_comments = []
-
-        telegrams: List[dict] = []
-        if 'CommunicationLog' in self.xml_data and 'Telegram' in self.xml_data['CommunicationLog']:
-            telegrams = self.xml_data['CommunicationLog']['Telegram']
-            if not isinstance(telegrams, list):
-                telegrams = [telegrams]
-
-        print(f"\nVerarbeite {len(telegrams)} Telegramme...")
+        print("\nVerarbeite Telegramme...")
         if self.verbose:
             print(f"Filtere nach Gruppenadresse(n): {', '.join(self.filter_list)}")
-        
-        # Fortschrittsbalken für die Verarbeitung
-        # last_effective_ga: letzter ermittelter GA-Kontext für Nicht-ACK-Telegramme
-        # last_destination: wohin der letzte Datensatz geschrieben wurde ('filtered' | 'other')
-        last_effective_ga: str | None = None
-        last_destination: str | None = None  # 'filtered' | 'other'
-        for idx in tqdm(range(0, len(telegrams)), desc="Verarbeite Telegramme"):
-            telegram = telegrams[idx]
-            rawdata = telegram.get('@RawData', '')
-            if not rawdata:
-                continue
 
-            # ACK-Frames sind kurz (z.B. 12 Bytes = 24 Hex-Zeichen) und enden mit CC
-            is_ack = rawdata.endswith('CC') and len(rawdata) <= 24
-
-            if is_ack:
-                # Bestätigung folgt der letzten Zielentscheidung
-                if last_destination == 'other':
-                    other_telegrams.append(telegram)
-                    other_comments.append("")
-                else:
-                    # Standard/Fallback: gefilterte Datei
-                    filtered_telegrams.append(telegram)
-                    filtered_comments.append("")
-                continue
+        filtered_count = 0
+        other_count = 0
+        try:
+            # Beide Ausgaben werden während des Parsens Zeile für Zeile geschrieben;
+            # ein großer Schreibpuffer hält die Anzahl der Systemaufrufe klein.
+            # Mit --discard-others wird die zweite Datei gar nicht erst angelegt
+            keep_others = not self.discard_others
+            with self.open_output(self.output_filename) as filtered_file, \
+                 (self.open_output(self.other_filename) if keep_others else contextlib.nullcontext()) as other_file:
 
-            # Nicht-ACK → GA regulär ermitteln
-            group_address = extract_group_address(rawdata, self.verbose)
-            if group_address == "IGNORE" or group_address == "":
-                # Kein sinnvolles GA ermittelbar → IM ZWEIFEL zur gefilterten Datei
-                physical_address = KNXSplitter.get_physical_address(rawdata)
-                ign_comment = f"<!-- GA: IGNORE (unbestimmt) ; QA: {physical_address} -->"
-                filtered_telegrams.append(telegram)
-                filtered_comments.append(ign_comment)
-                last_destination = 'filtered'
-                continue
+                # last_effective_ga: letzter ermittelter GA-Kontext für Nicht-ACK-Telegramme
+                # last_destination: wohin der letzte Datensatz geschrieben wurde ('filtered' | 'other')
+                last_effective_ga: str | None = None
+                last_destination: str | None = None  # 'filtered' | 'other'
+                haupt_codes, mittel_codes, ga_codes = self.filter_codes
+                verbose = self.verbose
+                # Gebundene write-Methoden einmalig auflösen statt pro Telegramm
+                write_filtered = filtered_file.write
+                write_other = other_file.write if keep_others else None
 
-            last_effective_ga = group_address
+                def on_start(name, attrs):
+                    # Telegram-Elemente sind flach (selbstschließend, ohne Kinder): alles
+                    # Nötige steht in den Attributen, ein Baum wird nie aufgebaut.
+                    nonlocal last_effective_ga, last_destination, filtered_count, other_count
+                    if name != 'Telegram':
+                        return
+                    rawdata = attrs.get('RawData', '')
+                    if not rawdata:
+                        return
+                    telegram_part = '<Telegram' + ''.join(f' {k}={quoteattr(v)}' for k, v in attrs.items()) + ' />'
 
-            physical_address = KNXSplitter.get_physical_address(rawdata)
-            comment = f"<!-- GA: {group_address} ; QA: {physical_address} -->"
+                    # ACK-Frames sind kurz (z.B. 12 Bytes = 24 Hex-Zeichen) und enden mit CC;
+                    # der billige Längenvergleich zuerst, da die meisten Telegramme länger sind
+                    is_ack = len(rawdata) <= 24 and rawdata.endswith('CC')
 
-            if any(group_address.startswith(f) for f in self.filter_list):
-                filtered_telegrams.append(telegram)
-                filtered_comments.append(comment)
-                if self.verbose:
-                    print(f"Gefunden: {group_address}")
-                last_destination = 'filtered'
-            else:
-                other_telegrams.append(telegram)
-                other_comments.append(comment)
-                last_destination = 'other'
-
-        commlog_attrs = {k: v for k, v in self.xml_data['CommunicationLog'].items() if not k == 'Telegram'}
-        filtered_data = {'CommunicationLog': {**commlog_attrs, 'Telegram': filtered_telegrams}}
-        other_data = {'CommunicationLog': {**commlog_attrs, 'Telegram': other_telegrams}}
-
-        def insert_comments(xml_path, comments):
-            # Fügt Kommentare an jede Telegramm-Zeile an und richtet diese
-            # gemäß Spaltenvorgaben aus (Kommentarbeginn Spalte 165, Semikolon Spalte 183).
-            with open(xml_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            new_lines = []
-            comment_idx = 0
-            for line in lines:
-                if '<Telegram' in line and '</Telegram>' in line:
-                    # Entferne alle Tabs und führende Leerzeichen
-                    line = line.lstrip()
-                    # Extrahiere den Teil bis zum RawData-Attribut
-                    parts = line.split('RawData="')
-                    if len(parts) == 2:
-                        rawdata_part = parts[1].split('"')[0]
-                        # Erstelle die neue Zeile mit selbstschließendem Tag
-                        telegram_part = f'{parts[0]}RawData="{rawdata_part}" />'
-                        
-                        # Nur wenn ein Kommentar vorhanden ist, füge ihn hinzu
-                        if comment_idx < len(comments) and comments[comment_idx]:
-                            # Füge Leerzeichen hinzu, bis Spalte 165 erreicht ist
-                            # Berücksichtige die 4 Leerzeichen am Anfang
-                            spaces_needed = 165 - (len(telegram_part) + 4)  # +4 für die Einrückung
-                            if spaces_needed > 0:
-                                telegram_part = telegram_part + ' ' * spaces_needed
-                            
-                            # Formatiere den Kommentar mit Semikolon in Spalte 183
-                            comment = comments[comment_idx].replace('<!-- ', '')  # Entferne <!-- vom Anfang
-                            ga_part = comment.split(';')[0].strip()  # Teil bis zum Semikolon, ohne Leerzeichen
-                            qa_part = comment.split(';')[1].strip()  # Teil nach dem Semikolon, ohne Leerzeichen
-                            
-                            # Berechne die aktuelle Position nach dem Telegram-Tag und den Leerzeichen
-                            current_pos = len(telegram_part) + 4  # +4 für die Einrückung
-                            
-                            # Berechne die Position des Semikolons
-                            semicolon_pos = current_pos + 5 + len(ga_part)  # Position des Semikolons
-                            spaces_before_semicolon = 183 - semicolon_pos  # Leerzeichen bis Spalte 183
-                            
-                            if spaces_before_semicolon > 0:
-                                # Füge Leerzeichen nach ga_part hinzu
-                                ga_part = ga_part + ' ' * spaces_before_semicolon
-                                # Stelle sicher, dass das Semikolon in Spalte 183 steht
-                                comment = f'<!-- {ga_part}; {qa_part}'
-                                # Keine weitere Debug-Ausgabe
-                            
-                            line = f'    {telegram_part}{comment}\n'  # 4 Leerzeichen für die Einrückung
+                    if is_ack:
+                        # Bestätigung folgt der letzten Zielentscheidung
+                        if last_destination == 'other':
+                            if keep_others:
+                                write_other(format_telegram_line(telegram_part))
+                            other_count += 1
                         else:
-                            # Wenn kein Kommentar vorhanden ist, nur das Telegramm ohne Leerzeichen
-                            line = f'    {telegram_part}\n'  # 4 Leerzeichen für die Einrückung
-                        comment_idx += 1
-                new_lines.append(line)
-            with open(xml_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+                            # Standard/Fallback: gefilterte Datei
+                            write_filtered(format_telegram_line(telegram_part))
+                            filtered_count += 1
+                        return
+
+                    # Nicht-ACK → GA regulär ermitteln
+                    destination, source = parse_addresses(rawdata, verbose)
+                    physical_address = format_physical_address(source)
+                    if destination is None:
+                        # Kein sinnvolles GA ermittelbar → IM ZWEIFEL zur gefilterten Datei
+                        write_filtered(format_telegram_line(telegram_part, "IGNORE (unbestimmt)", physical_address))
+                        filtered_count += 1
+                        last_destination = 'filtered'
+                        return
+
+                    group_address = format_group_address(destination)
+                    last_effective_ga = group_address
+
+                    # Hauptgruppe, Haupt-/Mittelgruppe oder ganze GA gegen die Filter-Codes prüfen →
+                    # drei Lookups, unabhängig von der Anzahl der Filter
+                    if (destination >> 12 in haupt_codes
+                            or destination >> 8 in mittel_codes
+                            or destination in ga_codes):
+                        write_filtered(format_telegram_line(telegram_part, group_address, physical_address))
+                        filtered_count += 1
+                        if verbose:
+                            print(f"Gefunden: {group_address}")
+                        last_destination = 'filtered'
+                    else:
+                        # Verworfene Telegramme werden gar nicht erst formatiert
+                        if keep_others:
+                            write_other(format_telegram_line(telegram_part, group_address, physical_address))
+                        other_count += 1
+                        last_destination = 'other'
+
+                parser = expat.ParserCreate()
+                parser.StartElementHandler = on_start
+                # Eingabe per mmap einblenden: der Kernel liest die Seiten beim sequentiellen
+                # Durchlauf nach, die Blöcke gehen ohne Kopie als memoryview an expat.
+                # Fortschritt nach verarbeiteten Bytes, einmal je Block statt je Telegramm
+                # aktualisiert: kein Zählen der Telegramme im Voraus nötig
+                with open(self.input_file, 'rb') as input_file, \
+                     mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                     memoryview(mapped) as view, \
+                     tqdm(total=len(view), unit='B', unit_scale=True, unit_divisor=1024,
+                          mininterval=0.5, desc="Verarbeite Telegramme") as pbar:
+                    for pos in range(0, len(view), READ_CHUNK_SIZE):
+                        with view[pos:pos + READ_CHUNK_SIZE] as chunk:
+                            parser.Parse(chunk, False)
+                            pbar.update(len(chunk))
+                    parser.Parse(b'', True)
+
+                filtered_file.write('</CommunicationLog>')
+                if keep_others:
+                    other_file.write('</CommunicationLog>')
 
-        try:
-            # Speichere die gefilterten Telegramme
-            with open(self.output_filename, 'w', encoding='utf-8') as file:
-                xmltodict.unparse(filtered_data, output=file, pretty=True)
-            insert_comments(self.output_filename, filtered_comments)
             print(f"\nTelegramme mit Gruppenadresse {', '.join(self.filter_list)} wurden in {self.output_filename} gespeichert")
-            print(f"Anzahl der Telegramme: {len(filtered_telegrams)}")
+            print(f"Anzahl der Telegramme: {filtered_count}")
 
-            # Speichere die anderen Telegramme (immer zweite Datei erzeugen)
-            with open(self.other_filename, 'w', encoding='utf-8') as file:
-                xmltodict.unparse(other_data, output=file, pretty=True)
-            insert_comments(self.other_filename, other_comments)
-            print(f"\nAndere Telegramme wurden in {self.other_filename} gespeichert")
-            print(f"Anzahl der Telegramme: {len(other_telegrams)}")
+            if keep_others:
+                print(f"\nAndere Telegramme wurden in {self.other_filename} gespeichert")
+            else:
+                print("\nAndere Telegramme wurden verworfen (--discard-others)")
+            print(f"Anzahl der Telegramme: {other_count}")
 
         except Exception as e:
-            print(f"Fehler beim Speichern der Dateien: {e}")
+            print(f"Fehler beim Verarbeiten der Dateien: {e}")
             sys.exit(1)
 
 def main():